@@ -6,8 +6,49 @@ from typing import Any
 from .metrics import StagehandMetrics
 from .utils import convert_dict_keys_to_camel_case
 
+try:
+    # orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError
+    from orjson import dumps as _dumps
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+    def _dumps(obj: Any) -> bytes:
+        # Same compact UTF-8 encoding httpx uses for json= bodies
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+        ).encode("utf-8")
+
+
 __all__ = ["_create_session", "_execute", "_get_replay_metrics"]
 
+# Read size for streamed responses; large reads coalesce many small SSE frames
+STREAM_CHUNK_SIZE = 65536
+
+
+# SSE frame prefix, matched on raw bytes so lines are never decoded to str
+_SSE_DATA_PREFIX = b"data: "
+
+
+async def _iter_stream_lines(response):
+    """
+    Yield the raw lines completed by each chunk of a streaming response,
+    reading it in large chunks. Each item is the list of lines for one chunk.
+    """
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+        buffer += chunk
+        lines = []
+        start = 0
+        while (newline := buffer.find(b"\n", start)) != -1:
+            lines.append(buffer[start:newline].rstrip(b"\r"))
+            start = newline + 1
+        del buffer[:start]
+        if lines:
+            yield lines
+    if buffer:
+        yield [buffer.rstrip(b"\r")]
+
 
 async def _create_session(self):
     """
@@ -117,17 +158,7 @@ async def _execute(self, method: str, payload: dict[str, Any]) -> Any:
     Internal helper to call /sessions/{session_id}/{method} with the given method and payload.
     Streams line-by-line, returning the 'result' from the final message (if any).
     """
-    headers = {
-        "x-bb-api-key": self.browserbase_api_key,
-        "x-bb-project-id": self.browserbase_project_id,
-        "Content-Type": "application/json",
-        "Connection": "keep-alive",
-        "x-sent-at": datetime.now().isoformat(),
-        # Always enable streaming for better log handling
-        "x-stream-response": "true",
-    }
-    if self.model_api_key:
-        headers["x-model-api-key"] = self.model_api_key
+    headers = {**self._execute_headers, "x-sent-at": datetime.now().isoformat()}
 
     payload_options = payload.get("modelClientOptions", {})
     instance_options = self.model_client_options or {}
@@ -153,10 +184,16 @@ async def _execute(self, method: str, payload: dict[str, Any]) -> Any:
     # async with self._client:
     try:
         # Always use streaming for consistent log handling
+        url_prefix = self._session_url_prefix
+        if url_prefix is None:
+            url_prefix = self._session_url_prefix = (
+                f"{self.api_url}/sessions/{self.session_id}/"
+            )
         async with self._client.stream(
             "POST",
-            f"{self.api_url}/sessions/{self.session_id}/{method}",
-            json=modified_payload,
+            url_prefix + method,
+            # Serialized up front so orjson, when installed, encodes the body
+            content=_dumps(modified_payload),
             headers=headers,
         ) as response:
             if response.status_code != 200:
@@ -169,39 +206,48 @@ async def _execute(self, method: str, payload: dict[str, Any]) -> Any:
                     f"Request failed with status {response.status_code}: {error_message}"
                 )
             result = None
-
-            async for line in response.aiter_lines():
-                # Skip empty lines
-                if not line.strip():
-                    continue
-
-                try:
-                    # Handle SSE-style messages that start with "data: "
-                    if line.startswith("data: "):
-                        line = line[len("data: ") :]
-
-                    message = json.loads(line)
-                    # Handle different message types
-                    msg_type = message.get("type")
-
-                    if msg_type == "system":
-                        status = message.get("data", {}).get("status")
-                        if status == "error":
-                            error_msg = message.get("data", {}).get(
-                                "error", "Unknown error"
+            # Bound once so the per-line dispatch skips the attribute lookups
+            get_handler_name = self._MSG_HANDLERS.get
+
+            try:
+                async for lines in _iter_stream_lines(response):
+                    for line in lines:
+                        # Skip empty lines
+                        if not line.strip():
+                            continue
+
+                        try:
+                            # Handle SSE-style messages that start with "data: "
+                            if line.startswith(_SSE_DATA_PREFIX):
+                                line = line[len(_SSE_DATA_PREFIX) :]
+
+                            # Both json and orjson parse UTF-8 bytes directly
+                            message = _loads(line)
+                            # Dispatch on message type; only "system" produces a result
+                            try:
+                                msg_type = message["type"]
+                            except KeyError:
+                                msg_type = None
+                            handler_name = get_handler_name(msg_type)
+                            if handler_name is None:
+                                # Log any other message types
+                                self.logger.debug(f"[UNKNOWN] Message type: {msg_type}")
+                                continue
+
+                            outcome = await getattr(self, handler_name)(message)
+                            if outcome is not None:
+                                result = outcome
+                        except (json.JSONDecodeError, UnicodeDecodeError):
+                            self.logger.error(
+                                "Could not parse line as JSON: "
+                                f"{line.decode('utf-8', errors='replace')}"
                             )
-                            self.logger.error(f"[ERROR] {error_msg}")
-                            raise RuntimeError(f"Server returned error: {error_msg}")
-                        elif status == "finished":
-                            result = message.get("data", {}).get("result")
-                    elif msg_type == "log":
-                        # Process log message using _handle_log
-                        await self._handle_log(message)
-                    else:
-                        # Log any other message types
-                        self.logger.debug(f"[UNKNOWN] Message type: {msg_type}")
-                except json.JSONDecodeError:
-                    self.logger.error(f"Could not parse line as JSON: {line}")
+
+                    # Deliver the logs buffered from this chunk in one callback
+                    await self._flush_log_batch()
+            finally:
+                # Logs received before a server error are still delivered
+                await self._flush_log_batch()
 
             # Return the final result
             return result
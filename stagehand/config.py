@@ -21,6 +21,7 @@ class StagehandConfig(BaseModel):
         model_api_key (Optional[str]): Model API key.
         model_client_options (Optional[dict[str, Any]]): Options for the model client.
         logger (Optional[Callable[[Any], None]]): Custom logging function.
+        log_batch_handler (Optional[Callable[[list[Any]], Any]]): Async function receiving server logs in batches.
         verbose (Optional[int]): Verbosity level for logs (1=minimal, 2=medium, 3=detailed).
         use_rich_logging (bool): Whether to use Rich for colorized logging.
         dom_settle_timeout_ms (Optional[int]): Timeout for DOM to settle (in milliseconds).
@@ -32,6 +33,7 @@ class StagehandConfig(BaseModel):
         system_prompt (Optional[str]): System prompt to use for LLM interactions.
         local_browser_launch_options (Optional[dict[str, Any]]): Local browser launch options.
         use_api (bool): Whether to use API mode.
+        use_http2 (bool): Use HTTP/2 for Stagehand API calls (requires the h2 package).
         experimental (bool): Enable experimental features.
     """
 
@@ -63,6 +65,11 @@ class StagehandConfig(BaseModel):
     logger: Optional[Callable[[Any], None]] = Field(
         None, description="Custom logging function"
     )
+    log_batch_handler: Optional[Callable[[list[Any]], Any]] = Field(
+        None,
+        alias="logBatchHandler",
+        description="Async function receiving server logs in batches, one call per streamed chunk",
+    )
     use_rich_logging: Optional[bool] = Field(
         True, description="Whether to use Rich for colorized logging"
     )
@@ -117,6 +124,11 @@ class StagehandConfig(BaseModel):
         alias=None,
         description="Whether to use experimental features",
     )
+    use_http2: Optional[bool] = Field(
+        False,
+        alias="useHttp2",
+        description="Use HTTP/2 for Stagehand API calls (requires the h2 package)",
+    )
 
     # --- Native Agent Initial A11y Context Injection (Python parity with TS) ---
     agent_initial_a11y_context_mode: Optional[Literal["none", "text", "json", "both"]] = Field(
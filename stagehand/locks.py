@@ -0,0 +1,62 @@
+import asyncio
+from collections import deque
+
+
+class SessionLock:
+    """
+    Lightweight FIFO lock used to serialize API calls for a Stagehand session.
+
+    Uncontended acquisition only flips a flag, so the common single-writer case
+    never allocates a future or suspends. When the lock is released while tasks
+    are waiting, ownership is handed directly to the oldest waiter.
+    """
+
+    # __weakref__ lets Stagehand index live locks in a WeakValueDictionary
+    __slots__ = ("_locked", "_waiters", "__weakref__")
+
+    def __init__(self):
+        self._locked = False
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def locked(self) -> bool:
+        """Return True if the lock is currently held."""
+        return self._locked
+
+    async def acquire(self) -> bool:
+        """Acquire the lock, waiting in FIFO order if it is already held."""
+        if not self._locked:
+            self._locked = True
+            return True
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Ownership was handed to us just before cancellation; pass it on
+                self.release()
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            raise
+        return True
+
+    def release(self):
+        """Release the lock, handing it to the next live waiter if there is one."""
+        if not self._locked:
+            raise RuntimeError("SessionLock is not acquired.")
+
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                # The lock stays held; the waiter now owns it
+                fut.set_result(True)
+                return
+        self._locked = False
+
+    async def __aenter__(self):
+        await self.acquire()
+        return None
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
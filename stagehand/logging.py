@@ -642,6 +642,12 @@ class StagehandLogger:
         """Log an info message (level 1)"""
         self.log(message, level=1, category=category, auxiliary=auxiliary)
 
+    def warning(
+        self, message: str, category: str = None, auxiliary: dict[str, Any] = None
+    ):
+        """Log a warning message (level 1, like server-sent warnings)"""
+        self.log(message, level=1, category=category, auxiliary=auxiliary)
+
     def debug(
         self, message: str, category: str = None, auxiliary: dict[str, Any] = None
     ):
@@ -1,10 +1,15 @@
 import asyncio
+import functools
+import importlib.util
 import os
 import signal
+import ssl
 import sys
+import threading
 import time
+import weakref
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 import httpx
 import nest_asyncio
@@ -26,6 +31,7 @@ from .browser import (
 from .config import StagehandConfig, default_config
 from .context import StagehandContext
 from .llm import LLMClient
+from .locks import SessionLock
 from .logging import StagehandLogger, default_log_handler
 from .metrics import StagehandFunctionName, StagehandMetrics
 from .page import StagehandPage
@@ -33,6 +39,18 @@ from .utils import get_download_path, make_serializable
 
 load_dotenv()
 
+# HTTP/2 needs the optional h2 package (pip install "stagehand[speedups]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_ssl_context() -> ssl.SSLContext:
+    """
+    Build the default TLS context once and share it across clients.
+    Loading the CA bundle dominates the cost of constructing a Stagehand.
+    """
+    return httpx.create_ssl_context()
+
 
 class LivePageProxy:
     """
@@ -131,8 +149,18 @@ class Stagehand:
     Main Stagehand class.
     """
 
-    _session_locks = {}
+    # Clients keep a strong reference to their session's lock, so an entry
+    # disappears once no client for that session is left
+    _session_locks = weakref.WeakValueDictionary()
+    # WeakValueDictionary.setdefault is plain Python and not atomic, so
+    # first-time inserts are guarded to keep one lock per session
+    _session_locks_guard = threading.Lock()
     _cleanup_called = False
+    # Streamed message types mapped to the name of the method that handles them
+    _MSG_HANDLERS: ClassVar[dict[str, str]] = {
+        "system": "_handle_system",
+        "log": "_handle_log",
+    }
 
     def __init__(
         self,
@@ -220,6 +248,9 @@ class Stagehand:
 
         # Initialize the centralized logger with the specified verbosity
         self.on_log = self.config.logger or default_log_handler
+        # When set, server logs are buffered and delivered once per streamed chunk
+        self.on_log_batch = self.config.log_batch_handler
+        self._log_batch: list[dict[str, Any]] = []
         self.logger = StagehandLogger(
             verbose=self.verbose,
             external_logger=self.on_log,
@@ -257,7 +288,41 @@ class Stagehand:
         # Register signal handlers for graceful shutdown
         self._register_signal_handlers()
 
-        self._client = httpx.AsyncClient(timeout=self.timeout_settings)
+        # Constant headers for streamed API calls; _execute only adds x-sent-at
+        self._execute_headers = {
+            "x-bb-api-key": self.browserbase_api_key,
+            "x-bb-project-id": self.browserbase_project_id,
+            "Content-Type": "application/json",
+            # Always enable streaming for better log handling
+            "x-stream-response": "true",
+        }
+        # HTTP/2 is opt-in, so the transport doesn't change just because some
+        # other package happened to pull in h2
+        self.use_http2 = bool(self.config.use_http2)
+        if self.use_http2 and not _HTTP2_AVAILABLE:
+            self.logger.warning(
+                "use_http2 requires the h2 package (pip install h2); "
+                "falling back to HTTP/1.1"
+            )
+            self.use_http2 = False
+        if not self.use_http2:
+            # Connection-specific headers are forbidden over HTTP/2
+            self._execute_headers["Connection"] = "keep-alive"
+        if self.model_api_key:
+            self._execute_headers["x-model-api-key"] = self.model_api_key
+
+        # One pooled client is reused for every API call so repeated requests
+        # to the same host keep their connection alive between calls. With
+        # use_http2, concurrent calls are multiplexed over a single connection.
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_settings,
+            verify=_shared_ssl_context(),
+            http2=self.use_http2,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+        )
 
         self._playwright: Optional[Playwright] = None
         self._browser = None
@@ -352,13 +417,13 @@ class Stagehand:
 
     def start_inference_timer(self):
         """Start timer for tracking inference time."""
-        self._inference_start_time = time.time()
+        self._inference_start_time = time.perf_counter()
 
     def get_inference_time_ms(self) -> int:
         """Get elapsed inference time in milliseconds."""
         if self._inference_start_time == 0:
             return 0
-        return int((time.time() - self._inference_start_time) * 1000)
+        return int((time.perf_counter() - self._inference_start_time) * 1000)
 
     def update_metrics(
         self,
@@ -458,13 +523,35 @@ class Stagehand:
         except Exception as e:
             self.logger.debug(f"Failed to update metrics from response: {str(e)}")
 
-    def _get_lock_for_session(self) -> asyncio.Lock:
+    @property
+    def session_id(self) -> Optional[str]:
+        """The Browserbase session ID this client is bound to."""
+        return self._session_id
+
+    @session_id.setter
+    def session_id(self, value: Optional[str]):
+        self._session_id = value
+        # Rebuilt lazily by _execute and _get_lock_for_session from the new ID
+        self._session_url_prefix = None
+        self._session_lock = None
+
+    def _get_lock_for_session(self) -> SessionLock:
         """
-        Return an asyncio.Lock for this session. If one doesn't exist yet, create it.
+        Return a SessionLock for this session. If one doesn't exist yet, create it.
         """
-        if self.session_id not in self._session_locks:
-            self._session_locks[self.session_id] = asyncio.Lock()
-        return self._session_locks[self.session_id]
+        # Resolved once per session ID, then served from the instance
+        lock = self._session_lock
+        if lock is None:
+            lock = self._session_locks.get(self.session_id)
+            if lock is None:
+                # Only a session's first call inserts; setdefault returns the
+                # lock another client already installed for this session, if any
+                with self._session_locks_guard:
+                    lock = self._session_locks.setdefault(
+                        self.session_id, SessionLock()
+                    )
+            self._session_lock = lock
+        return lock
 
     async def __aenter__(self):
         self.logger.debug("Entering Stagehand context manager (__aenter__)...")
@@ -618,10 +705,10 @@ class Stagehand:
                     "Cannot end server session: HTTP client not available."
                 )
 
-            if self._client:
-                self.logger.debug("Closing the internal HTTPX client...")
-                await self._client.aclose()
-                self._client = None
+        if self._client:
+            self.logger.debug("Closing the internal HTTPX client...")
+            await self._client.aclose()
+            self._client = None
 
         # Use the centralized cleanup function for browser resources
         await cleanup_browser_resources(
@@ -632,8 +719,27 @@ class Stagehand:
             self.logger,
         )
 
+        # Other clients may still share this session's lock, so only this
+        # client's reference is dropped; the table entry goes with the last one
+        self._session_lock = None
+
         self._closed = True
 
+    async def _handle_system(self, msg: dict[str, Any]) -> Any:
+        """
+        Handle a system message from the server.
+        Raises on server errors and returns the result carried by a 'finished' message.
+        """
+        data = msg.get("data", {})
+        status = data.get("status")
+        if status == "error":
+            error_msg = data.get("error", "Unknown error")
+            self.logger.error(f"[ERROR] {error_msg}")
+            raise RuntimeError(f"Server returned error: {error_msg}")
+        if status == "finished":
+            return data.get("result")
+        return None
+
     async def _handle_log(self, msg: dict[str, Any]):
         """
         Handle a log message from the server.
@@ -642,6 +748,11 @@ class Stagehand:
         try:
             log_data = msg.get("data", {})
 
+            # Buffer for the batch callback; _execute flushes at chunk boundaries
+            if self.on_log_batch:
+                self._log_batch.append(log_data)
+                return
+
             # Call user-provided callback with original data if available
             if self.on_log:
                 await self.on_log(log_data)
@@ -691,6 +802,18 @@ class Stagehand:
         except Exception as e:
             self.logger.error(f"Error processing log message: {str(e)}")
 
+    async def _flush_log_batch(self):
+        """
+        Deliver buffered server logs to the on_log_batch callback in a single call.
+        """
+        if not self._log_batch:
+            return
+        batch, self._log_batch = self._log_batch, []
+        try:
+            await self.on_log_batch(batch)
+        except Exception as e:
+            self.logger.error(f"Error processing log batch: {str(e)}")
+
     def _log(
         self, message: str, level: int = 1, category: str = None, auxiliary: dict = None
     ):
@@ -760,47 +883,33 @@ class Stagehand:
 
         return self._live_page_proxy
 
-    def __getattribute__(self, name):
+    @property
+    def metrics(self) -> StagehandMetrics:
         """
-        Intercept access to 'metrics' to fetch from API when use_api=True.
+        Get the token usage and inference time metrics for this client.
+        Fetched from the API when use_api=True, otherwise tracked locally.
         """
-        if name == "metrics":
-            use_api = (
-                object.__getattribute__(self, "use_api")
-                if hasattr(self, "use_api")
-                else False
-            )
-
-            if use_api:
-                # Need to fetch from API
-                try:
-                    # Get the _get_replay_metrics method
-                    get_replay_metrics = object.__getattribute__(
-                        self, "_get_replay_metrics"
-                    )
-
-                    # Try to get current event loop
-                    try:
-                        asyncio.get_running_loop()
-                        # We're in an async context, need to handle this carefully
-                        # Create a new task and wait for it
-                        nest_asyncio.apply()
-                        return asyncio.run(get_replay_metrics())
-                    except RuntimeError:
-                        # No event loop running, we can use asyncio.run directly
-                        return asyncio.run(get_replay_metrics())
-                except Exception as e:
-                    # Log error and return empty metrics
-                    logger = object.__getattribute__(self, "logger")
-                    if logger:
-                        logger.error(f"Failed to fetch metrics from API: {str(e)}")
-                    return StagehandMetrics()
-            else:
-                # Return local metrics
-                return object.__getattribute__(self, "_local_metrics")
+        if not self.use_api:
+            # Return local metrics
+            return self._local_metrics
 
-        # For all other attributes, use normal behavior
-        return object.__getattribute__(self, name)
+        # Need to fetch from API
+        try:
+            # Try to get current event loop
+            try:
+                asyncio.get_running_loop()
+                # We're in an async context, need to handle this carefully
+                # Create a new task and wait for it
+                nest_asyncio.apply()
+                return asyncio.run(self._get_replay_metrics())
+            except RuntimeError:
+                # No event loop running, we can use asyncio.run directly
+                return asyncio.run(self._get_replay_metrics())
+        except Exception as e:
+            # Log error and return empty metrics
+            if self.logger:
+                self.logger.error(f"Failed to fetch metrics from API: {str(e)}")
+            return StagehandMetrics()
 
 
 # Bind the imported API methods to the Stagehand class
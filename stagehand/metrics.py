@@ -41,9 +41,9 @@ def start_inference_timer() -> float:
     """Start timing inference latency.
 
     Returns:
-        The start time as a float timestamp.
+        The start time as a monotonic perf_counter reading.
     """
-    return time.time()
+    return time.perf_counter()
 
 
 def get_inference_time_ms(start_time: float) -> int:
@@ -57,4 +57,4 @@ def get_inference_time_ms(start_time: float) -> int:
     """
     if start_time == 0:
         return 0
-    return int((time.time() - start_time) * 1000)
+    return int((time.perf_counter() - start_time) * 1000)
@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from typing import Dict, Any
 
 from stagehand import Stagehand, StagehandConfig
+from stagehand.locks import SessionLock
 from stagehand.schemas import ActResult, ExtractResult, ObserveResult
 
 
@@ -88,7 +89,7 @@ def mock_stagehand_page(mock_playwright_page):
     mock_client.logger.debug = MagicMock()
     mock_client.logger.warning = MagicMock()
     mock_client.logger.error = MagicMock()
-    mock_client._get_lock_for_session = MagicMock(return_value=AsyncMock())
+    mock_client._get_lock_for_session = MagicMock(return_value=SessionLock())
     mock_client._execute = AsyncMock()
     mock_client.update_metrics = MagicMock()
     
@@ -238,7 +239,7 @@ def mock_stagehand_client(mock_stagehand_config):
         client.agent = MagicMock()
         client._client = MagicMock()
         client._execute = AsyncMock()
-        client._get_lock_for_session = MagicMock(return_value=AsyncMock())
+        client._get_lock_for_session = MagicMock(return_value=SessionLock())
         
         return client
 
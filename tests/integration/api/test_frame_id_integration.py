@@ -3,6 +3,7 @@ Integration tests for frame ID functionality with the API.
 Tests that frame IDs are properly tracked and sent to the server.
 """
 
+import json
 import pytest
 import os
 from unittest.mock import patch, AsyncMock, MagicMock
@@ -42,11 +43,11 @@ class TestFrameIdIntegration:
             mock_stream_response.__aenter__ = AsyncMock(return_value=mock_stream_response)
             mock_stream_response.__aexit__ = AsyncMock()
             
-            # Mock the async iterator for streaming lines
-            async def mock_aiter_lines():
-                yield 'data: {"type": "system", "data": {"status": "finished", "result": {"success": true}}}'
+            # Mock the async iterator for streamed chunks
+            async def mock_aiter_bytes(chunk_size=None):
+                yield b'data: {"type": "system", "data": {"status": "finished", "result": {"success": true}}}\n'
             
-            mock_stream_response.aiter_lines = mock_aiter_lines
+            mock_stream_response.aiter_bytes = mock_aiter_bytes
             mock_client.stream = MagicMock(return_value=mock_stream_response)
             
             # Initialize Stagehand
@@ -84,7 +85,7 @@ class TestFrameIdIntegration:
                 # Check the stream call was made with frameId
                 stream_call_args = mock_client.stream.call_args
                 if stream_call_args:
-                    payload = stream_call_args[1].get('json', {})
+                    payload = json.loads(stream_call_args[1].get('content', b'{}'))
                     assert 'frameId' in payload
                     assert payload['frameId'] == test_frame_id
                 
@@ -2,7 +2,12 @@
 
 from .mock_llm import MockLLMClient, MockLLMResponse
 from .mock_browser import MockBrowser, MockBrowserContext, MockPlaywrightPage
-from .mock_server import MockStagehandServer
+from .mock_server import (
+    MockHttpClient,
+    MockStagehandServer,
+    MockStreamingHttpClient,
+    MockStreamResponse,
+)
 
 __all__ = [
     "MockLLMClient",
@@ -10,5 +15,8 @@ __all__ = [
     "MockBrowser",
     "MockBrowserContext",
     "MockPlaywrightPage",
-    "MockStagehandServer"
+    "MockHttpClient",
+    "MockStagehandServer",
+    "MockStreamingHttpClient",
+    "MockStreamResponse",
 ] 
\ No newline at end of file
@@ -59,6 +59,67 @@ class MockHttpResponse:
             )
 
 
+class MockStreamResponse:
+    """Lightweight streaming response yielding canned byte chunks"""
+
+    def __init__(
+        self,
+        chunks: List[bytes],
+        status_code: int = 200,
+        error: Optional[Exception] = None,
+    ):
+        self.status_code = status_code
+        self._chunks = chunks
+        # Raised when the stream is opened, as httpx does for transport errors
+        self._error = error
+
+    async def aiter_bytes(self, chunk_size: Optional[int] = None):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def aread(self) -> bytes:
+        return b"".join(self._chunks)
+
+    async def __aenter__(self):
+        if self._error is not None:
+            raise self._error
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class MockStreamingHttpClient:
+    """Lightweight stand-in for httpx.AsyncClient.stream that records each call"""
+
+    def __init__(self, response: MockStreamResponse):
+        self.response = response
+        self.calls = []
+
+    def stream(self, method: str, url: str, **kwargs) -> MockStreamResponse:
+        self.calls.append((method, url, kwargs))
+        return self.response
+
+    async def aclose(self):
+        pass
+
+
+class MockHttpClient:
+    """Lightweight stand-in for httpx.AsyncClient.post that records each call"""
+
+    def __init__(self, response: Any):
+        self.response = response
+        self.calls = []
+        self.aclose_calls = 0
+
+    async def post(self, url: str, **kwargs) -> Any:
+        self.calls.append((url, kwargs))
+        return self.response
+
+    async def aclose(self):
+        self.aclose_calls += 1
+
+
 class MockStagehandServer:
     """Mock Stagehand server for testing API interactions"""
     
@@ -199,23 +260,11 @@ class MockStagehandServer:
         # Remove base URL and extract the last path component
         path = url.split("/")[-1]
         
-        # Handle common Stagehand endpoints - check exact matches to avoid substring issues
+        # Session creation is matched on the URL; every other endpoint, named
+        # ones like navigate/act/observe/extract included, is its last path part
         if "session" in url and "create" in url:
-            endpoint = "create_session"
-        elif path == "navigate":
-            endpoint = "navigate"
-        elif path == "act":
-            endpoint = "act"
-        elif path == "observe":
-            endpoint = "observe"
-        elif path == "extract":
-            endpoint = "extract"
-        elif path == "screenshot":
-            endpoint = "screenshot"
-        else:
-            endpoint = path or "unknown"
-            
-        return endpoint
+            return "create_session"
+        return path or "unknown"
     
     def set_response_override(self, endpoint: str, response: Union[Dict, callable]):
         """Override the default response for a specific endpoint"""
@@ -6,6 +6,7 @@ Tests the implementation of frame ID map in StagehandContext and StagehandPage.
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from stagehand.context import StagehandContext
+from stagehand.locks import SessionLock
 from stagehand.page import StagehandPage
 
 
@@ -153,8 +154,7 @@ class TestFrameIdTracking:
         
         # Mock the stagehand client for API mode
         mock_stagehand.use_api = True
-        mock_stagehand._get_lock_for_session = MagicMock()
-        mock_stagehand._get_lock_for_session.return_value = AsyncMock()
+        mock_stagehand._get_lock_for_session = MagicMock(return_value=SessionLock())
         mock_stagehand._execute = AsyncMock(return_value={"success": True})
         
         # Test goto with frame ID
@@ -4,6 +4,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from pydantic import BaseModel
 
+from stagehand.locks import SessionLock
 from stagehand.page import StagehandPage
 from stagehand.schemas import (
     ActOptions,
@@ -79,7 +80,7 @@ class TestPageNavigation:
         mock_stagehand_page._stagehand.use_api = True
         mock_stagehand_page._stagehand._execute = AsyncMock(return_value={"success": True})
         
-        lock = AsyncMock()
+        lock = SessionLock()
         mock_stagehand_page._stagehand._get_lock_for_session.return_value = lock
         
         await mock_stagehand_page.goto("https://example.com")
@@ -0,0 +1,64 @@
+"""Test the per-session SessionLock used to serialize API calls"""
+
+import asyncio
+
+import pytest
+
+from stagehand.locks import SessionLock
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_uncontended_acquire_does_not_wait():
+    """Acquiring a free lock should not queue a waiter"""
+    lock = SessionLock()
+
+    async with lock:
+        assert lock.locked()
+        assert not lock._waiters
+
+    assert not lock.locked()
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_waiters_acquire_in_fifo_order():
+    """Queued tasks should be handed the lock in arrival order"""
+    lock = SessionLock()
+    order = []
+
+    async def worker(name):
+        async with lock:
+            order.append(name)
+
+    await lock.acquire()
+    tasks = [asyncio.create_task(worker(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert len(lock._waiters) == 3
+
+    lock.release()
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2]
+    assert not lock.locked()
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_cancelled_waiter_is_skipped():
+    """A waiter cancelled while queued should not receive the lock"""
+    lock = SessionLock()
+    await lock.acquire()
+
+    waiter = asyncio.create_task(lock.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    lock.release()
+    assert not lock.locked()
+    assert not lock._waiters
+
+
+def test_release_unlocked_raises():
+    """Releasing a lock that is not held is an error"""
+    with pytest.raises(RuntimeError, match="not acquired"):
+        SessionLock().release()
@@ -9,6 +9,13 @@ from stagehand.types import ExtractOptions, ExtractResult, DefaultExtractSchema
 from tests.mocks.mock_llm import MockLLMClient, MockLLMResponse
 
 
+class ProductModel(BaseModel):
+    """Shared schema so the Pydantic validator is built once per session"""
+    name: str
+    price: float
+    in_stock: bool = True
+
+
 class TestExtractHandlerInitialization:
     """Test ExtractHandler initialization and setup"""
     
@@ -117,11 +124,6 @@ class TestExtractExecution:
         mock_client.start_inference_timer = MagicMock()
         mock_client.update_metrics = MagicMock()
         
-        class ProductModel(BaseModel):
-            name: str
-            price: float
-            in_stock: bool = True
-        
         handler = ExtractHandler(mock_stagehand_page, mock_client, "")
         mock_stagehand_page._page.content = AsyncMock(return_value="<html><body>Product page</body></html>")
         
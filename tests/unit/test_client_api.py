@@ -1,17 +1,31 @@
-import asyncio
 import json
+import re
 import unittest.mock as mock
 
+import httpx
 import pytest
-from httpx import AsyncClient, Response
+import pytest_asyncio
 
 from stagehand import Stagehand
+from tests.mocks.mock_server import MockStreamingHttpClient, MockStreamResponse
 
+_RE_CONN = re.compile("Connection failed")
+_RE_400 = re.compile("Request failed with status 400")
+_RE_SERVER = re.compile("Server returned error: boom")
+_RE_TIMEOUT = re.compile("Request timed out")
 
+_FINISHED = (
+    b'data: {"type": "system", "data": {"status": "finished", "result": {"key": "value"}}}\n'
+)
+_LOG = b'data: {"type": "log", "data": {"message": "Log message 1"}}\n'
+_SERVER_ERROR = b'data: {"type": "system", "data": {"status": "error", "error": "boom"}}\n'
+
+
+@pytest.mark.asyncio(loop_scope="module")
 class TestClientAPI:
     """Tests for the Stagehand client API interactions."""
 
-    @pytest.fixture
+    @pytest_asyncio.fixture(loop_scope="module")
     async def mock_client(self):
         """Create a mock Stagehand client for testing."""
         client = Stagehand(
@@ -23,174 +37,142 @@ class TestClientAPI:
         )
         return client
 
-    @pytest.mark.asyncio
-    async def test_execute_success(self, mock_client):
-        """Test successful execution of a streaming API request."""
-
-        # Create a custom implementation of _execute for testing
-        async def mock_execute(method, payload):
-            # Print debug info
-            print("\n==== EXECUTING TEST_METHOD ====")
-            print(
-                f"URL: {mock_client.api_url}/sessions/{mock_client.session_id}/{method}"
-            )
-            print(f"Payload: {payload}")
-            print(
-                f"Headers: {{'x-bb-api-key': '{mock_client.browserbase_api_key}', 'x-bb-project-id': '{mock_client.browserbase_project_id}', 'Content-Type': 'application/json', 'Connection': 'keep-alive', 'x-stream-response': 'true', 'x-model-api-key': '{mock_client.model_api_key}'}}"
-            )
-
-            # Return the expected result directly
-            return {"key": "value"}
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Call _execute and check results
-        result = await mock_client._execute("test_method", {"param": "value"})
-
-        # Verify result matches the expected value
-        assert result == {"key": "value"}
+    def _mock_stream(self, mock_client, chunks, status_code=200, error=None):
+        """Point mock_client._client at a canned streaming response."""
+        mock_client._client = MockStreamingHttpClient(
+            MockStreamResponse(chunks, status_code, error)
+        )
+        return mock_client._client
+
+    @pytest.mark.parametrize(
+        "chunks, status_code, error, want, exc",
+        [
+            ([_LOG, _FINISHED], 200, None, {"key": "value"}, None),
+            ([_LOG], 200, None, None, None),
+            ([b"Bad request"], 400, None, None, (RuntimeError, _RE_400)),
+            ([_SERVER_ERROR], 200, None, None, (RuntimeError, _RE_SERVER)),
+            (
+                [],
+                200,
+                httpx.ConnectError("Connection failed"),
+                None,
+                (httpx.ConnectError, _RE_CONN),
+            ),
+            (
+                [],
+                200,
+                httpx.ReadTimeout("Request timed out"),
+                None,
+                (httpx.ReadTimeout, _RE_TIMEOUT),
+            ),
+        ],
+        ids=[
+            "success",
+            "no_finished_message",
+            "error_response",
+            "server_error",
+            "connection_error",
+            "timeout",
+        ],
+    )
+    async def test_execute_variants(
+        self, mock_client, chunks, status_code, error, want, exc
+    ):
+        """Test _execute results and error propagation for each response variant."""
+        self._mock_stream(mock_client, chunks, status_code, error)
+
+        if exc is None:
+            result = await mock_client._execute("test_method", {"param": "value"})
+            assert result == want
+        else:
+            exc_type, pattern = exc
+            with pytest.raises(exc_type, match=pattern):
+                await mock_client._execute("test_method", {"param": "value"})
+
+    async def test_execute_parses_streamed_lines(self, mock_client):
+        """Test the real _execute parser skips bad lines and returns the result."""
+        # Frames are split across chunk boundaries to exercise line reassembly
+        http_client = self._mock_stream(
+            mock_client,
+            [
+                b"\ninvalid json here\r\ndata: {\"type\": \"log\", ",
+                b'"data": {"message": "Log message 1"}}\n',
+                b'data: {"type": "system", "data": {"status": "finished", "result": {"key": "value"}}}',
+            ],
+        )
+        mock_client.on_log = mock.AsyncMock()
+        mock_client.logger.error = mock.MagicMock()
 
-    @pytest.mark.asyncio
-    async def test_execute_error_response(self, mock_client):
-        """Test handling of error responses."""
-        # Create a mock implementation that simulates an error response
-        async def mock_execute(method, payload):
-            # Simulate the error handling that would happen in the real _execute method
-            raise RuntimeError("Request failed with status 400: Bad request")
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Call _execute and expect it to raise the error
-        with pytest.raises(RuntimeError, match="Request failed with status 400"):
-            await mock_client._execute("test_method", {"param": "value"})
-
-    @pytest.mark.asyncio
-    async def test_execute_connection_error(self, mock_client):
-        """Test handling of connection errors."""
-
-        # Create a custom implementation of _execute that raises an exception
-        async def mock_execute(method, payload):
-            # Print debug info
-            print("\n==== EXECUTING TEST_METHOD ====")
-            print(
-                f"URL: {mock_client.api_url}/sessions/{mock_client.session_id}/{method}"
-            )
-            print(f"Payload: {payload}")
-            print(
-                f"Headers: {{'x-bb-api-key': '{mock_client.browserbase_api_key}', 'x-bb-project-id': '{mock_client.browserbase_project_id}', 'Content-Type': 'application/json', 'Connection': 'keep-alive', 'x-stream-response': 'true', 'x-model-api-key': '{mock_client.model_api_key}'}}"
-            )
-
-            # Raise the expected exception
-            raise Exception("Connection failed")
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Call _execute and check it raises the exception
-        with pytest.raises(Exception, match="Connection failed"):
-            await mock_client._execute("test_method", {"param": "value"})
-
-    @pytest.mark.asyncio
-    async def test_execute_invalid_json(self, mock_client):
-        """Test handling of invalid JSON in streaming response."""
-        # Create a mock log method
-        mock_client._log = mock.MagicMock()
-
-        # Create a custom implementation of _execute for testing
-        async def mock_execute(method, payload):
-            # Print debug info
-            print("\n==== EXECUTING TEST_METHOD ====")
-            print(
-                f"URL: {mock_client.api_url}/sessions/{mock_client.session_id}/{method}"
-            )
-            print(f"Payload: {payload}")
-            print(
-                f"Headers: {{'x-bb-api-key': '{mock_client.browserbase_api_key}', 'x-bb-project-id': '{mock_client.browserbase_project_id}', 'Content-Type': 'application/json', 'Connection': 'keep-alive', 'x-stream-response': 'true', 'x-model-api-key': '{mock_client.model_api_key}'}}"
-            )
-
-            # Log an error for the invalid JSON
-            mock_client._log("Could not parse line as JSON: invalid json here", level=2)
-
-            # Return the expected result
-            return {"key": "value"}
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Call _execute and check results
         result = await mock_client._execute("test_method", {"param": "value"})
 
-        # Should return the result despite the invalid JSON line
         assert result == {"key": "value"}
+        mock_client.on_log.assert_awaited_once_with({"message": "Log message 1"})
+        mock_client.logger.error.assert_called_once_with(
+            "Could not parse line as JSON: invalid json here"
+        )
 
-        # Verify error was logged
-        mock_client._log.assert_called_with(
-            "Could not parse line as JSON: invalid json here", level=2
+        _, url, kwargs = http_client.calls[0]
+        assert url == "http://test-server.com/sessions/test-session-123/test_method"
+        assert json.loads(kwargs["content"]) == {"param": "value"}
+        headers = kwargs["headers"]
+        assert headers["x-bb-api-key"] == "test-api-key"
+        assert headers["x-model-api-key"] == "test-model-api-key"
+        assert "x-sent-at" in headers
+        assert "x-sent-at" not in mock_client._execute_headers
+
+    async def test_execute_on_log_batch_callback(self, mock_client):
+        """Test logs are delivered to on_log_batch once per streamed chunk."""
+        self._mock_stream(
+            mock_client,
+            [
+                b'data: {"type": "log", "data": {"message": "Log message 1"}}\n'
+                b'data: {"type": "log", "data": {"message": "Log message 2"}}\n',
+                b'data: {"type": "log", "data": {"message": "Log message 3"}}\n'
+                b'data: {"type": "system", "data": {"status": "finished", "result": 1}}\n',
+            ],
+        )
+        mock_client.on_log = mock.AsyncMock()
+        mock_client.on_log_batch = mock.AsyncMock()
+
+        result = await mock_client._execute("test_method", {})
+
+        assert result == 1
+        mock_client.on_log.assert_not_called()
+        assert mock_client.on_log_batch.await_args_list == [
+            mock.call([{"message": "Log message 1"}, {"message": "Log message 2"}]),
+            mock.call([{"message": "Log message 3"}]),
+        ]
+
+    async def test_execute_dispatches_to_instance_handler(self, mock_client):
+        """Test handlers are looked up on the instance, so overrides are honoured."""
+        self._mock_stream(
+            mock_client,
+            [
+                b'data: {"type": "log", "data": {"message": "Log message 1"}}\n'
+                b'data: {"type": "system", "data": {"status": "finished", "result": 1}}\n',
+            ],
         )
+        mock_client._handle_log = mock.AsyncMock()
 
-    @pytest.mark.asyncio
-    async def test_execute_no_finished_message(self, mock_client):
-        """Test handling of streaming response with no 'finished' message."""
-        # Create a mock implementation that simulates no finished message
-        async def mock_execute(method, payload):
-            # Simulate processing log messages but not receiving a finished message
-            # In the real implementation, this would return None
-            return None
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Mock the _handle_log method to track calls
-        log_calls = []
-        async def mock_handle_log(message):
-            log_calls.append(message)
-        
-        mock_client._handle_log = mock_handle_log
+        result = await mock_client._execute("test_method", {})
 
-        # Call _execute - it should return None when no finished message is received
-        result = await mock_client._execute("test_method", {"param": "value"})
-        
-        # Should return None when no finished message is found
-        assert result is None
-
-    @pytest.mark.asyncio
-    async def test_execute_on_log_callback(self, mock_client):
-        """Test the on_log callback is called for log messages."""
-        # Setup a mock on_log callback
-        on_log_mock = mock.AsyncMock()
-        mock_client.on_log = on_log_mock
-
-        # Create a mock implementation that simulates processing log messages
-        async def mock_execute(method, payload):
-            # Simulate processing two log messages and then a finished message
-            # Mock calling _handle_log for each log message
-            await mock_client._handle_log({"type": "log", "data": {"message": "Log message 1"}})
-            await mock_client._handle_log({"type": "log", "data": {"message": "Log message 2"}})
-            # Return the final result
-            return {"key": "value"}
-
-        # Replace the method with our mock
-        mock_client._execute = mock_execute
-
-        # Mock the _handle_log method and track calls
-        log_calls = []
-        async def mock_handle_log(message):
-            log_calls.append(message)
-        
-        mock_client._handle_log = mock_handle_log
+        assert result == 1
+        mock_client._handle_log.assert_awaited_once_with(
+            {"type": "log", "data": {"message": "Log message 1"}}
+        )
 
-        # Call _execute
-        result = await mock_client._execute("test_method", {"param": "value"})
+    async def test_execute_url_follows_session_id(self, mock_client):
+        """Test the cached session URL prefix is rebuilt when session_id changes."""
+        finished = [b'data: {"type": "system", "data": {"status": "finished"}}\n']
+        self._mock_stream(mock_client, finished)
+        await mock_client._execute("act", {})
 
-        # Should return the result from the finished message
-        assert result == {"key": "value"}
-        
-        # Verify _handle_log was called for each log message
-        assert len(log_calls) == 2
+        mock_client.session_id = "other-session"
+        http_client = self._mock_stream(mock_client, finished)
+        await mock_client._execute("act", {})
+
+        assert http_client.calls[0][1] == "http://test-server.com/sessions/other-session/act"
 
-    @pytest.mark.asyncio
     async def test_check_server_health(self, mock_client):
         """Test server health check."""
         # Since _check_server_health doesn't exist in the actual code,
@@ -201,7 +183,6 @@ class TestClientAPI:
         assert result is True
         mock_client._health_check.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_check_server_health_failure(self, mock_client):
         """Test server health check failure and retry."""
         # Mock a health check that fails
@@ -210,16 +191,3 @@ class TestClientAPI:
         result = await mock_client._health_check()
         assert result is False
         mock_client._health_check.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_api_timeout_handling(self, mock_client):
-        """Test API timeout handling."""
-        # Mock the _execute method to simulate a timeout
-        async def timeout_execute(method, payload):
-            raise TimeoutError("Request timed out after 30 seconds")
-
-        mock_client._execute = timeout_execute
-
-        # Test that timeout errors are properly raised
-        with pytest.raises(TimeoutError, match="Request timed out after 30 seconds"):
-            await mock_client._execute("test_method", {"param": "value"})
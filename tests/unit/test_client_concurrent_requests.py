@@ -0,0 +1,124 @@
+"""Test that concurrent API requests on one session are serialized by the session lock"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from stagehand import Stagehand
+from stagehand.page import StagehandPage
+
+
+@pytest.fixture(scope="module")
+def real_stagehand():
+    """One real client shared by the module; only _execute is replaced per test."""
+    stagehand = Stagehand(
+        api_url="http://test-server.com",
+        browserbase_session_id="test-concurrent-session",
+        api_key="test-api-key",
+        project_id="test-project-id",
+        model_api_key="test-model-api-key",
+    )
+    return stagehand
+
+
+@pytest.fixture
+def delay():
+    """Simulated server latency; small because only ordering is under test."""
+    return 0.005
+
+
+@pytest.fixture
+def execution_log(real_stagehand, delay, monkeypatch):
+    """Replace _execute with a slow fake and return the (event, url) list it records into."""
+    log = []
+
+    async def logged_execute(method, payload):
+        log.append(("start", payload["url"]))
+        await asyncio.sleep(delay)
+        log.append(("end", payload["url"]))
+        return {"success": True}
+
+    monkeypatch.setattr(real_stagehand, "_execute", logged_execute)
+    return log
+
+
+@pytest.fixture
+def page(real_stagehand):
+    return StagehandPage(MagicMock(), real_stagehand)
+
+
+# Suspending once is enough for an unserialized request to overlap, so no
+# wall-clock time is spent here
+@pytest.mark.parametrize("delay", [0])
+@pytest.mark.asyncio(loop_scope="module")
+async def test_concurrent_requests_serialization(page, execution_log):
+    """Concurrent goto() calls on one session must never overlap on the server."""
+    tasks = [page.goto(f"https://example.com/{i}") for i in range(5)]
+    await asyncio.gather(*tasks)
+
+    # Appends happen in execution order, so events must strictly alternate
+    # start/end for the same request; no timestamps are needed to show it
+    assert len(execution_log) == 10
+    for i in range(0, len(execution_log), 2):
+        assert execution_log[i] == ("start", execution_log[i + 1][1])
+        assert execution_log[i + 1][0] == "end"
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_lock_performance_overhead(page, execution_log, delay):
+    """Serializing through the lock should cost little beyond the requests themselves."""
+    # Serialized requests cannot beat back-to-back execution, so the ideal
+    # is known up front and only the concurrent run needs to be measured
+    sequential_time = 10 * delay
+
+    start = time.perf_counter_ns()
+    await asyncio.gather(
+        *(page.goto(f"https://example.com/concurrent/{i}") for i in range(10))
+    )
+    concurrent_time = (time.perf_counter_ns() - start) / 1e9
+
+    # Leave headroom for timer overshoot on asyncio.sleep in busy CI runners
+    assert concurrent_time <= sequential_time * 1.5
+
+
+def test_lock_per_session(real_stagehand):
+    """Each session gets its own lock, reused on every call."""
+    other = Stagehand(
+        api_url="http://test-server.com",
+        browserbase_session_id="test-other-session",
+        api_key="test-api-key",
+        project_id="test-project-id",
+    )
+    lock = real_stagehand._get_lock_for_session()
+    assert real_stagehand._get_lock_for_session() is lock
+    assert other._get_lock_for_session() is not lock
+
+    # The cached lock follows the client onto a new session, and the old
+    # session's lock goes away with its last reference
+    other.session_id = real_stagehand.session_id
+    assert other._get_lock_for_session() is lock
+    assert "test-other-session" not in Stagehand._session_locks
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_lock_survives_other_client_closing():
+    """Closing one client must not split the lock the session's other clients share."""
+    kwargs = dict(
+        api_url="http://test-server.com",
+        browserbase_session_id="test-shared-session",
+        api_key="test-api-key",
+        project_id="test-project-id",
+    )
+    first, second, closing = (Stagehand(**kwargs) for _ in range(3))
+    lock = first._get_lock_for_session()
+    assert second._get_lock_for_session() is lock
+    assert closing._get_lock_for_session() is lock
+
+    closing._execute = AsyncMock()
+    await closing.close()
+
+    assert first._get_lock_for_session() is lock
+    assert second._get_lock_for_session() is lock
+    assert Stagehand(**kwargs)._get_lock_for_session() is lock
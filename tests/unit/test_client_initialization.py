@@ -1,24 +1,59 @@
 import asyncio
+import copy
 import unittest.mock as mock
-import os
 
 import pytest
+from httpx import Response
+from playwright.async_api import PlaywrightContextManager
 
 from stagehand import Stagehand
 from stagehand.config import StagehandConfig
+from stagehand.logging import StagehandLogger
+from stagehand.metrics import StagehandFunctionName
+from tests.mocks.mock_server import MockHttpClient
+
+# Configs are treated as read-only, so one validated instance is shared
+LOCAL_CONFIG = StagehandConfig(env="LOCAL")
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Unset the environment variables Stagehand falls back to."""
+    for key in (
+        "BROWSERBASE_API_KEY",
+        "BROWSERBASE_PROJECT_ID",
+        "MODEL_API_KEY",
+        "STAGEHAND_API_URL",
+    ):
+        monkeypatch.delenv(key, raising=False)
+
+
+@pytest.fixture(scope="module")
+def base_client():
+    """One API-mode client per module; tests copy it before mutating."""
+    return Stagehand(
+        api_url="http://test-server.com",
+        api_key="test-api-key",
+        project_id="test-project-id",
+        model_api_key="test-model-api-key",
+    )
+
+
+@pytest.fixture(scope="module")
+def base_local_client():
+    """One LOCAL-mode client per module; tests copy it before mutating."""
+    return Stagehand(config=LOCAL_CONFIG)
 
 
 class TestClientInitialization:
     """Tests for the Stagehand client initialization and configuration."""
 
     @pytest.mark.smoke
-    @mock.patch.dict(os.environ, {}, clear=True)
-    def test_init_with_direct_params(self):
+    def test_init_with_direct_params(self, clean_env):
         """Test initialization with direct parameters."""
-        # Create a config with LOCAL env to avoid BROWSERBASE validation issues
-        config = StagehandConfig(env="LOCAL")
+        # Use a LOCAL config to avoid BROWSERBASE validation issues
         client = Stagehand(
-            config=config,
+            config=LOCAL_CONFIG,
             api_url="http://test-server.com",
             browserbase_session_id="test-session",
             api_key="test-api-key",
@@ -36,8 +71,7 @@ class TestClientInitialization:
         assert client._closed is False
 
     @pytest.mark.smoke
-    @mock.patch.dict(os.environ, {}, clear=True)
-    def test_init_with_config(self):
+    def test_init_with_config(self, clean_env):
         """Test initialization with a configuration object."""
         config = StagehandConfig(
             env="LOCAL",  # Use LOCAL to avoid BROWSERBASE validation
@@ -59,22 +93,19 @@ class TestClientInitialization:
         assert client.browserbase_project_id == "config-project-id"
         assert client.model_name == "gpt-4"
         assert client.dom_settle_timeout_ms == 500
-        assert hasattr(client, "self_heal")
         assert client.self_heal is True
-        assert hasattr(client, "wait_for_captcha_solves")
         assert client.wait_for_captcha_solves is True
-        assert hasattr(client, "config")
-        assert hasattr(client, "system_prompt")
         assert client.system_prompt == "Custom system prompt for testing"
 
-    @mock.patch.dict(os.environ, {}, clear=True)
-    def test_config_priority_over_direct_params(self):
+    def test_config_priority_over_direct_params(self, clean_env):
         """Test that config parameters take precedence over direct parameters (except session_id)."""
-        config = StagehandConfig(
-            env="LOCAL",  # Use LOCAL to avoid BROWSERBASE validation
-            api_key="config-api-key",
-            project_id="config-project-id",
-            browserbase_session_id="config-session-id",
+        # model_copy skips re-validating the shared LOCAL config
+        config = LOCAL_CONFIG.model_copy(
+            update={
+                "api_key": "config-api-key",
+                "project_id": "config-project-id",
+                "browserbase_session_id": "config-session-id",
+            }
         )
 
         client = Stagehand(
@@ -110,150 +141,197 @@ class TestClientInitialization:
                     browserbase_session_id="test-session", project_id="test-project-id"
                 )
 
-    def test_init_as_context_manager(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_init_as_context_manager(self, base_client):
         """Test the client as a context manager."""
-        client = Stagehand(
-            api_url="http://test-server.com",
-            browserbase_session_id="test-session",
-            api_key="test-api-key",
-            project_id="test-project-id",
-        )
+        client = copy.copy(base_client)
+        client.session_id = "test-session"
 
-        # Mock the async context manager methods
-        client.__aenter__ = mock.AsyncMock(return_value=client)
-        client.__aexit__ = mock.AsyncMock()
+        # Only init/close are faked; the real __aenter__/__aexit__ run
         client.init = mock.AsyncMock()
         client.close = mock.AsyncMock()
 
-        # We can't easily test an async context manager in a non-async test,
-        # so we just verify the methods exist and are async
-        assert hasattr(client, "__aenter__")
-        assert hasattr(client, "__aexit__")
-
-        # Verify init is called in __aenter__
-        assert client.init is not None
+        async with client as entered:
+            assert entered is client
+            client.init.assert_awaited_once()
+            client.close.assert_not_awaited()
 
-        # Verify close is called in __aexit__
-        assert client.close is not None
+        client.close.assert_awaited_once()
 
-    @pytest.mark.asyncio
-    async def test_init_playwright_timeout(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_init_playwright_timeout(self, base_local_client):
         """Test that init() raises TimeoutError when playwright takes too long to start."""
-        config = StagehandConfig(env="LOCAL")
-        client = Stagehand(config=config)
-
-        # Mock async_playwright to simulate a hanging start() method
-        mock_playwright_instance = mock.AsyncMock()
-        mock_start = mock.AsyncMock()
-        
-        # Make start() hang indefinitely
-        async def hanging_start():
-            await asyncio.sleep(100)  # Sleep longer than the 30s timeout
-        
-        mock_start.side_effect = hanging_start
-        mock_playwright_instance.start = mock_start
+        client = copy.copy(base_local_client)
+
+        # Make start() fail the way wait_for does once its 30s timeout expires
+        mock_playwright_instance = mock.AsyncMock(spec=PlaywrightContextManager)
+        mock_playwright_instance.start.side_effect = asyncio.TimeoutError
 
         with mock.patch("stagehand.main.async_playwright", return_value=mock_playwright_instance):
-            # The init() method should raise TimeoutError due to the 30-second timeout
+            # wait_for propagates the TimeoutError out of init()
             with pytest.raises(asyncio.TimeoutError):
                 await client.init()
 
         # Ensure the client is not marked as initialized
         assert client._initialized is False
 
-    @pytest.mark.asyncio
-    async def test_create_session(self):
-        """Test session creation."""
-        client = Stagehand(
-            api_url="http://test-server.com",
-            api_key="test-api-key",
-            project_id="test-project-id",
-            model_api_key="test-model-api-key",
-        )
-
-        # Override the _create_session method for easier testing
-        original_create_session = client._create_session
-
-        async def mock_create_session():
-            client.session_id = "new-test-session-id"
-
-        client._create_session = mock_create_session
-
-        # Call _create_session
-        await client._create_session()
-
-        # Verify session ID was set
-        assert client.session_id == "new-test-session-id"
-
-    @pytest.mark.asyncio
-    async def test_create_session_failure(self):
-        """Test session creation failure."""
-        client = Stagehand(
-            api_url="http://test-server.com",
-            api_key="test-api-key",
-            project_id="test-project-id",
-            model_api_key="test-model-api-key",
-        )
-
-        # Override the _create_session method to raise an error
-        original_create_session = client._create_session
-
-        async def mock_create_session():
-            raise RuntimeError("Failed to create session: Invalid request")
-
-        client._create_session = mock_create_session
-
-        # Call _create_session and expect error
-        with pytest.raises(RuntimeError, match="Failed to create session"):
-            await client._create_session()
-
-    @pytest.mark.asyncio
-    async def test_create_session_invalid_response(self):
-        """Test session creation with invalid response format."""
-        client = Stagehand(
-            api_url="http://test-server.com",
-            api_key="test-api-key",
-            project_id="test-project-id",
-            model_api_key="test-model-api-key",
-        )
-
-        # Override the _create_session method to raise a specific error
-        original_create_session = client._create_session
-
-        async def mock_create_session():
-            raise RuntimeError("Invalid response format: {'success': true, 'data': {}}")
-
-        client._create_session = mock_create_session
-
-        # Call _create_session and expect error
-        with pytest.raises(RuntimeError, match="Invalid response format"):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_init_when_already_initialized(self, base_local_client):
+        """Test that init() returns early without starting playwright again."""
+        client = copy.copy(base_local_client)
+        client._initialized = True
+
+        with mock.patch("stagehand.main.async_playwright") as mock_async_playwright:
+            await client.init()
+
+        mock_async_playwright.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "already_closed, execute_error, expect_cleanup",
+        [
+            (False, None, True),
+            (False, Exception("API error"), True),
+            (True, None, False),
+        ],
+        ids=["close", "end_session_error", "already_closed"],
+    )
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_close(self, base_client, already_closed, execute_error, expect_cleanup):
+        """Test close() ends the session and releases resources exactly once."""
+        client = copy.copy(base_client)
+        client.session_id = "test-session-123"
+        client._closed = already_closed
+        client._execute = mock.AsyncMock(side_effect=execute_error)
+        client._playwright = mock.AsyncMock()
+        http_client = client._client = MockHttpClient(None)
+
+        await client.close()
+
+        assert client._closed is True
+        if expect_cleanup:
+            # A failed end call is logged and cleanup carries on
+            client._execute.assert_awaited_once_with(
+                "end", {"sessionId": "test-session-123"}
+            )
+            assert http_client.aclose_calls == 1
+            assert client._client is None
+            client._playwright.stop.assert_awaited_once()
+        else:
+            client._execute.assert_not_awaited()
+            assert http_client.aclose_calls == 0
+            client._playwright.stop.assert_not_awaited()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_close_releases_session_lock(self, base_client):
+        """Test a closed client no longer keeps its session's lock alive."""
+        client = copy.copy(base_client)
+        client.session_id = "test-close-lock-session"
+        client._execute = mock.AsyncMock()
+        client._client = MockHttpClient(None)
+        client._get_lock_for_session()
+
+        await client.close()
+
+        assert client._session_lock is None
+        assert "test-close-lock-session" not in Stagehand._session_locks
+
+    @pytest.mark.parametrize(
+        "response, error, want_session_id",
+        [
+            (
+                Response(
+                    200,
+                    json={"success": True, "data": {"sessionId": "new-test-session-id"}},
+                ),
+                None,
+                "new-test-session-id",
+            ),
+            (Response(400, text="Invalid request"), "Failed to create session", None),
+            (
+                Response(200, json={"success": True, "data": {}}),
+                "Invalid response format",
+                None,
+            ),
+        ],
+        ids=["success", "failure", "invalid_response"],
+    )
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_create_session(self, base_client, response, error, want_session_id):
+        """Test session creation and its error responses."""
+        client = copy.copy(base_client)
+        client._client = MockHttpClient(response)
+
+        if error is None:
             await client._create_session()
-
-    @mock.patch.dict(os.environ, {"MODEL_API_KEY": "test-model-api-key"}, clear=True)
-    def test_init_with_model_api_key_in_env(self):
-        config = StagehandConfig(env="LOCAL")
-        client = Stagehand(config=config)
+        else:
+            with pytest.raises(RuntimeError, match=error):
+                await client._create_session()
+
+        assert client.session_id == want_session_id
+        assert [url for url, _ in client._client.calls] == [
+            "http://test-server.com/sessions/start"
+        ]
+
+    @pytest.mark.parametrize(
+        "use_http2, h2_available, want_http2",
+        [(False, True, False), (True, True, True), (True, False, False)],
+        ids=["default", "opt_in", "opt_in_without_h2"],
+    )
+    def test_init_http2(self, use_http2, h2_available, want_http2):
+        """Test HTTP/2 is only used when requested and h2 is installed."""
+        with mock.patch("stagehand.main._HTTP2_AVAILABLE", h2_available), mock.patch(
+            "stagehand.main.httpx.AsyncClient"
+        ) as mock_async_client, mock.patch.object(
+            StagehandLogger, "warning"
+        ) as mock_warning:
+            client = Stagehand(config=LOCAL_CONFIG, use_http2=use_http2)
+
+        assert client.use_http2 is want_http2
+        if use_http2 and not h2_available:
+            mock_warning.assert_called_once_with(
+                "use_http2 requires the h2 package (pip install h2); "
+                "falling back to HTTP/1.1"
+            )
+        else:
+            mock_warning.assert_not_called()
+        assert mock_async_client.call_args.kwargs["http2"] is want_http2
+        # Connection-specific headers are only valid over HTTP/1.1
+        assert ("Connection" not in client._execute_headers) is want_http2
+
+    def test_init_with_model_api_key_in_env(self, clean_env, monkeypatch):
+        monkeypatch.setenv("MODEL_API_KEY", "test-model-api-key")
+        client = Stagehand(config=LOCAL_CONFIG)
         assert client.model_api_key == "test-model-api-key"
 
-    def test_init_with_custom_llm(self):
+    def test_metrics_local_mode(self):
+        client = Stagehand(config=LOCAL_CONFIG)
+        client.update_metrics(StagehandFunctionName.ACT, 10, 5, 100)
+        assert client.metrics is client._local_metrics
+        assert client.metrics.total_prompt_tokens == 10
+
+    @pytest.mark.parametrize(
+        "overrides, want_key, want_base_url",
+        [
+            ({}, "custom-llm-key", "https://custom-llm.com"),
+            (
+                {
+                    "model_client_options": {
+                        "apiKey": "override-llm-key",
+                        "baseURL": "https://override-llm.com",
+                    }
+                },
+                "override-llm-key",
+                "https://override-llm.com",
+            ),
+        ],
+        ids=["config", "override"],
+    )
+    def test_init_with_custom_llm(self, clean_env, overrides, want_key, want_base_url):
         config = StagehandConfig(
             env="LOCAL",
             model_client_options={"apiKey": "custom-llm-key", "baseURL": "https://custom-llm.com"}
         )
-        client = Stagehand(config=config)
-        assert client.model_api_key == "custom-llm-key"
-        assert client.model_client_options["apiKey"] == "custom-llm-key"
-        assert client.model_client_options["baseURL"] == "https://custom-llm.com"
-
-    def test_init_with_custom_llm_override(self):
-        config = StagehandConfig(
-            env="LOCAL",
-            model_client_options={"apiKey": "custom-llm-key", "baseURL": "https://custom-llm.com"}
-        )
-        client = Stagehand(
-            config=config,
-            model_client_options={"apiKey": "override-llm-key", "baseURL": "https://override-llm.com"}
-        )
-        assert client.model_api_key == "override-llm-key"
-        assert client.model_client_options["apiKey"] == "override-llm-key"
-        assert client.model_client_options["baseURL"] == "https://override-llm.com"
\ No newline at end of file
+        client = Stagehand(config=config, **overrides)
+        assert client.model_api_key == want_key
+        assert client.model_client_options["apiKey"] == want_key
+        assert client.model_client_options["baseURL"] == want_base_url
@@ -1,48 +1,79 @@
 import asyncio
-import json
+import itertools
 
 import pytest
+import pytest_asyncio
 
 from stagehand.main import Stagehand
 from stagehand.agent.agent import Agent
 from tests.mocks.mock_llm import MockLLMClient, MockLLMResponse
 
 
-@pytest.mark.asyncio
-async def test_native_agent_fallback(monkeypatch):
+class _Fn:
+    __slots__ = ("name", "arguments")
+
+    def __init__(self, name, arguments):
+        self.name = name
+        self.arguments = arguments
+
+
+class _ToolCall:
+    __slots__ = ("id", "function")
+
+    def __init__(self, call_id, name, arguments):
+        self.id = call_id
+        self.function = _Fn(name, arguments)
+
+
+class _Msg:
+    __slots__ = ("content", "tool_calls")
+
+    def __init__(self, tool_calls):
+        self.content = ""
+        self.tool_calls = tool_calls
+
+
+# Tool-call arguments exactly as they arrive on the wire
+_ARGS_GOTO = '{"url": "https://example.com"}'
+_ARGS_EXTRACT = '{"instruction": "get title", "schema": null}'
+_ARGS_CLOSE = '{"reasoning": "done", "success": true}'
+
+
+def _tool_call_response(call_id, name, arguments):
+    """Build an LLM response whose message carries a single tool call."""
+    resp = MockLLMResponse("")
+    resp.choices[0].message = _Msg([_ToolCall(call_id, name, arguments)])
+    return resp
+
+
+# Responses are never mutated by the agent, so one instance serves every turn
+_CLOSE_RESPONSE = _tool_call_response("call-1", "close", _ARGS_CLOSE)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def local_stagehand():
+    """One initialized LOCAL client per module; tests only swap its LLM."""
     stagehand = Stagehand(env="LOCAL", use_api=False,
                           model_name="unknown-native")
     await stagehand.init()
+    yield stagehand
+    await stagehand.close()
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_native_agent_fallback(local_stagehand, monkeypatch):
+    stagehand = local_stagehand
 
     # Swap in a mock LLM client
     mock_llm = MockLLMClient(default_model="unknown-native")
 
     # Configure the mock to simulate a tool call to close with success
     def custom_agent_response(messages, **kwargs):
-        class ToolCall:
-            def __init__(self):
-                self.id = "call-1"
-
-                class Fn:
-                    def __init__(self):
-                        self.name = "close"
-                        self.arguments = json.dumps(
-                            {"reasoning": "done", "success": True})
-
-                self.function = Fn()
-
-        class Msg:
-            def __init__(self):
-                self.content = ""
-                self.tool_calls = [ToolCall()]
-
-        resp = MockLLMResponse("")
-        resp.choices[0].message = Msg()
-        return resp
+        return _CLOSE_RESPONSE
 
     mock_llm.set_custom_response("agent", custom_agent_response)
 
-    stagehand.llm = mock_llm
+    monkeypatch.setattr(stagehand, "llm", mock_llm)
     agent: Agent = stagehand.agent(model="unknown-native")
 
     result = await agent.execute("test instruction")
@@ -50,57 +81,24 @@ async def test_native_agent_fallback(monkeypatch):
     assert (result.message or "").lower().startswith("done")
 
 
-@pytest.mark.asyncio
-async def test_native_agent_goto_and_extract(monkeypatch):
-    stagehand = Stagehand(env="LOCAL", use_api=False,
-                          model_name="unknown-native")
-    await stagehand.init()
-
-    # Mock LLM to issue goto then extract then close
-    sequence = []
-
-    def make_tool_call(name, args_dict):
-        class ToolCall:
-            def __init__(self):
-                self.id = f"call-{len(sequence)+1}"
-
-                class Fn:
-                    def __init__(self):
-                        self.name = name
-                        self.arguments = json.dumps(args_dict)
-
-                self.function = Fn()
-        return ToolCall()
+@pytest.mark.asyncio(loop_scope="module")
+async def test_native_agent_goto_and_extract(local_stagehand, monkeypatch):
+    stagehand = local_stagehand
 
-    class Msg:
-        def __init__(self, tool_calls):
-            self.content = ""
-            self.tool_calls = tool_calls
+    # Mock LLM to issue goto then extract then close; the last turn repeats
+    turns = [
+        _tool_call_response("call-1", "goto", _ARGS_GOTO),
+        _tool_call_response("call-2", "extract", _ARGS_EXTRACT),
+        _tool_call_response("call-3", "close", _ARGS_CLOSE),
+    ]
+    turn = itertools.count()
 
     def responder(messages, **kwargs):
-        if not sequence:
-            sequence.append("goto")
-            tc = make_tool_call("goto", {"url": "https://example.com"})
-            resp = MockLLMResponse("")
-            resp.choices[0].message = Msg([tc])
-            return resp
-        elif sequence == ["goto"]:
-            sequence.append("extract")
-            tc = make_tool_call(
-                "extract", {"instruction": "get title", "schema": None})
-            resp = MockLLMResponse("")
-            resp.choices[0].message = Msg([tc])
-            return resp
-        else:
-            tc = make_tool_call(
-                "close", {"reasoning": "done", "success": True})
-            resp = MockLLMResponse("")
-            resp.choices[0].message = Msg([tc])
-            return resp
+        return turns[min(next(turn), len(turns) - 1)]
 
     mock_llm = MockLLMClient(default_model="unknown-native")
     mock_llm.set_custom_response("agent", responder)
-    stagehand.llm = mock_llm
+    monkeypatch.setattr(stagehand, "llm", mock_llm)
 
     agent: Agent = stagehand.agent(model="unknown-native")
     result = await agent.execute("navigate and extract")